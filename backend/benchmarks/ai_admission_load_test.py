@@ -0,0 +1,198 @@
+"""
+Load test showing that a slow or failing OpenAI upstream does not degrade the non-AI
+routes. Measures GET /stats/{username} and POST /meals latency while many clients flood
+POST /meals/ai-infer against a local fake OpenAI server, first with the fake answering
+immediately (the baseline) and then with it slow or failing.
+
+With a slow upstream, calls take longer than the breaker's latency threshold but finish
+before the client timeout, so they succeed and trip the breaker as latency spikes.
+
+Runs the API in a uvicorn subprocess on a throwaway SQLite database, so no setup is needed:
+
+    python benchmarks/ai_admission_load_test.py --upstream slow
+    python benchmarks/ai_admission_load_test.py --upstream failing
+    python benchmarks/ai_admission_load_test.py --upstream slow --unprotected
+
+--unprotected raises the admission limits out of reach to show the behavior without them.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+from api_server import start_server
+
+MEAL_JSON = '{"title":"Grilled Chicken Salad","carbs":12.5,"proteins":35.0,"fats":9.0,"total_calories":270.0}'
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Answers chat completions after `delay` seconds, with HTTP 500 when `failing` is set"""
+
+    delay = 0.0
+    failing = False
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.delay)
+
+        if self.failing:
+            body = {"error": {"message": "upstream failure", "type": "server_error"}}
+            status = 500
+        else:
+            body = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "gpt-4o-mini",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": MEAL_JSON},
+                    "finish_reason": "stop"
+                }]
+            }
+            status = 200
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the API gave up on this call after its client timeout
+
+    def log_message(self, format, *args):
+        pass
+
+
+def server_environment(args, upstream_port: int) -> dict:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load_test.db')}"
+    env["OPENAI_API_KEY"] = "load-test"
+    env["OPENAI_BASE_URL"] = f"http://127.0.0.1:{upstream_port}/v1"
+    env.setdefault("AI_BREAKER_LATENCY_SECONDS", str(args.upstream_delay / 2))
+    env.setdefault("AI_UPSTREAM_TIMEOUT_SECONDS", str(args.upstream_delay * 2))
+    env.setdefault("AI_BREAKER_RESET_SECONDS", "5")
+
+    if args.unprotected:
+        for name in ("AI_MAX_CONCURRENT", "AI_MAX_QUEUE", "AI_USER_BURST", "AI_BREAKER_FAILURE_THRESHOLD"):
+            env[name] = "1000000"
+        env["AI_MAX_WAIT_SECONDS"] = "3600"
+
+    return env
+
+
+async def measure_non_ai_routes(client, duration: float, concurrency: int):
+    """Returns one latency per request, in ms, keyed by route"""
+    latencies = {"POST /meals": [], "GET /stats": []}
+    deadline = time.perf_counter() + duration
+
+    async def timed(route: str, request):
+        start = time.perf_counter()
+        await request
+        latencies[route].append((time.perf_counter() - start) * 1000)
+
+    async def worker(index: int):
+        username = f"reader-{index}"
+        while time.perf_counter() < deadline:
+            await timed("POST /meals", client.post("/meals", json={
+                "username": username,
+                "title": "Toast",
+                "carbs": 20,
+                "proteins": 5,
+                "fats": 3,
+                "total_calories": 127
+            }))
+            await timed("GET /stats", client.get(f"/stats/{username}"))
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return latencies
+
+
+async def flood_ai_route(client, stop: asyncio.Event, concurrency: int, retry_pause: float, statuses: Counter):
+    # Retry-After is ignored on purpose so protected and unprotected runs apply the same pressure
+    async def worker(index: int):
+        while not stop.is_set():
+            try:
+                response = await client.post("/meals/ai-infer", json={
+                    "description": "chicken salad",
+                    "username": f"ai-user-{index}"
+                })
+                statuses[response.status_code] += 1
+            except Exception:
+                statuses["client error"] += 1
+            await asyncio.sleep(retry_pause)
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+
+
+def summarize(phase: str, latencies: dict, statuses: Counter):
+    for route, samples in latencies.items():
+        samples = sorted(samples)
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        print(
+            f"{phase:<26} {route:<12} requests: {len(samples):6d}   "
+            f"p50: {statistics.median(samples):7.1f} ms   p99: {p99:7.1f} ms"
+        )
+    print(f"{phase:<26} AI route responses: {dict(statuses)}")
+
+
+async def measure_under_flood(client, args, phase: str):
+    stop = asyncio.Event()
+    statuses = Counter()
+    flood = asyncio.create_task(flood_ai_route(client, stop, args.ai_clients, args.retry_pause, statuses))
+    await asyncio.sleep(1)  # let the AI requests pile up first
+
+    latencies = await measure_non_ai_routes(client, args.duration, args.concurrency)
+
+    stop.set()
+    await flood
+    summarize(phase, latencies, statuses)
+
+
+async def run(args, base_url: str):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await measure_under_flood(client, args, "non-AI, fast upstream")
+
+        FakeOpenAIHandler.delay = args.upstream_delay
+        FakeOpenAIHandler.failing = args.upstream == "failing"
+        await measure_under_flood(client, args, f"non-AI, {args.upstream} upstream")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--upstream", choices=["slow", "failing"], default="slow")
+    parser.add_argument("--upstream-delay", type=float, default=4.0, help="Seconds the fake upstream takes to answer")
+    parser.add_argument("--unprotected", action="store_true", help="Disable admission limits for comparison")
+    parser.add_argument("--ai-clients", type=int, default=60, help="Concurrent clients calling /meals/ai-infer")
+    parser.add_argument("--retry-pause", type=float, default=0.5, help="Seconds each AI client waits between requests")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent clients calling the non-AI routes")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per measurement phase")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    upstream = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    upstream.daemon_threads = True
+    threading.Thread(target=upstream.serve_forever, daemon=True).start()
+
+    server = start_server(args.port, server_environment(args, upstream.server_port))
+    try:
+        asyncio.run(run(args, f"http://127.0.0.1:{args.port}"))
+    finally:
+        server.terminate()
+        server.wait()
+        upstream.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Runs the API in a uvicorn subprocess for the benchmark scripts in this directory."""
+
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def start_server(port: int, env: dict) -> subprocess.Popen:
+    """
+    Starts the API on `port` and waits for /health. Runs in its own process so the
+    load generator does not compete with it for the GIL.
+    """
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("API server did not start")
@@ -0,0 +1,122 @@
+"""
+Benchmarks GET /dashboard/{username} against the three-call flow the frontend used
+(/meals/{username}?date_filter=today, /stats/{username}/today and /stats/{username}
+fired in parallel) under concurrent load.
+
+Runs the API in a uvicorn subprocess on a throwaway SQLite database, so no setup is needed:
+
+    python benchmarks/dashboard_benchmark.py --concurrency 20 --page-loads 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Point the app at a throwaway database before any backend module is imported
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'benchmark.db')}"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import httpx
+from api_server import start_server
+from database import SessionLocal, engine
+from models import Base, Meal
+
+USERNAME = "benchmark-user"
+
+
+def seed(history_days: int, meals_per_day: int):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    now = datetime.now()
+    try:
+        db.add_all([
+            Meal(
+                username=USERNAME,
+                title=f"Meal {day}-{index}",
+                carbs=40.0,
+                proteins=25.0,
+                fats=12.0,
+                total_calories=400.0,
+                created_at=now - timedelta(days=day, minutes=index)
+            )
+            for day in range(history_days)
+            for index in range(meals_per_day)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def three_call_page_load(client: httpx.AsyncClient):
+    responses = await asyncio.gather(
+        client.get(f"/meals/{USERNAME}", params={"date_filter": "today"}),
+        client.get(f"/stats/{USERNAME}/today"),
+        client.get(f"/stats/{USERNAME}")
+    )
+    for response in responses:
+        response.raise_for_status()
+
+
+async def dashboard_page_load(client: httpx.AsyncClient):
+    response = await client.get(f"/dashboard/{USERNAME}")
+    response.raise_for_status()
+
+
+async def run_flow(name, page_load, base_url: str, concurrency: int, page_loads: int):
+    latencies = []
+    limits = httpx.Limits(max_connections=concurrency * 3)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await page_load(client)  # warm up
+
+        async def user():
+            for _ in range(page_loads):
+                start = time.perf_counter()
+                await page_load(client)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{name:<12} page loads/s: {len(latencies) / elapsed:8.1f}   "
+        f"p50: {statistics.median(latencies):7.1f} ms   p99: {p99:7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent simulated users")
+    parser.add_argument("--page-loads", type=int, default=50, help="Home page loads per user")
+    parser.add_argument("--history-days", type=int, default=365, help="Days of meal history to seed")
+    parser.add_argument("--meals-per-day", type=int, default=4, help="Meals seeded per day")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    seed(args.history_days, args.meals_per_day)
+    server = start_server(args.port, dict(os.environ))
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    print(
+        f"{args.concurrency} users x {args.page_loads} page loads, "
+        f"{args.history_days * args.meals_per_day} meals of history"
+    )
+    try:
+        asyncio.run(run_flow("three-call", three_call_page_load, base_url, args.concurrency, args.page_loads))
+        asyncio.run(run_flow("dashboard", dashboard_page_load, base_url, args.concurrency, args.page_loads))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import and_, func, select
+from datetime import date
+from typing import List
+from models import Meal
+
+class DashboardRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_dashboard_rows(self, username: str) -> List:
+        """
+        Fetches today's meals together with today's and lifetime totals in a single query.
+
+        The lifetime aggregate always yields exactly one row, which is left joined to
+        today's meals so the totals survive days without meals. Today's totals are
+        window aggregates over the joined rows.
+
+        Returns:
+            Rows with the lifetime totals, `meal` (None when there are no meals today)
+            and the today_* totals, ordered by created_at descending
+        """
+        username = username.strip()
+        today = date.today()
+
+        lifetime = select(
+            func.count(Meal.id).label("meal_count"),
+            func.coalesce(func.sum(Meal.carbs), 0).label("total_carbs"),
+            func.coalesce(func.sum(Meal.proteins), 0).label("total_proteins"),
+            func.coalesce(func.sum(Meal.fats), 0).label("total_fats"),
+            func.coalesce(func.sum(Meal.total_calories), 0).label("total_calories")
+        ).where(
+            Meal.username == username,
+            Meal.deleted_at.is_(None)
+        ).subquery()
+
+        today_meal = aliased(Meal, name="meal")
+
+        return self.db.query(
+            lifetime.c.meal_count,
+            lifetime.c.total_carbs,
+            lifetime.c.total_proteins,
+            lifetime.c.total_fats,
+            lifetime.c.total_calories,
+            today_meal,
+            func.count(today_meal.id).over().label("today_meal_count"),
+            func.coalesce(func.sum(today_meal.carbs).over(), 0).label("today_carbs"),
+            func.coalesce(func.sum(today_meal.proteins).over(), 0).label("today_proteins"),
+            func.coalesce(func.sum(today_meal.fats).over(), 0).label("today_fats"),
+            func.coalesce(func.sum(today_meal.total_calories).over(), 0).label("today_calories")
+        ).select_from(lifetime).outerjoin(
+            today_meal,
+            and_(
+                today_meal.username == username,
+                today_meal.deleted_at.is_(None),
+                func.date(today_meal.created_at) == today
+            )
+        ).order_by(today_meal.created_at.desc()).all()
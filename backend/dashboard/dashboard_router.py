@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from database import get_db
+from schemas import DashboardResponse
+from .dashboard_service import DashboardService
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+@router.get("/{username}", response_model=DashboardResponse)
+def get_dashboard(username: str, db: Session = Depends(get_db)):
+    """
+    Returns today's meals, today's stats and lifetime stats for a user in one response,
+    replacing separate calls to /meals/{username}?date_filter=today, /stats/{username}/today
+    and /stats/{username}.
+    """
+    service = DashboardService(db)
+    return service.get_dashboard(username)
@@ -0,0 +1,38 @@
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from datetime import date
+from schemas import DashboardResponse, MealResponse, StatsResponse, TodayStatsResponse
+from .dashboard_repository import DashboardRepository
+
+class DashboardService:
+    def __init__(self, db: Session):
+        self.repository = DashboardRepository(db)
+
+    def get_dashboard(self, username: str) -> DashboardResponse:
+        if not username or not username.strip():
+            raise HTTPException(status_code=400, detail="Username cannot be empty")
+
+        rows = self.repository.get_dashboard_rows(username)
+        # The lifetime aggregate guarantees at least one row, even for unknown users
+        first = rows[0]
+
+        meals = [MealResponse.model_validate(row.meal) for row in rows if row.meal is not None]
+
+        stats = StatsResponse(
+            total_carbs=first.total_carbs,
+            total_proteins=first.total_proteins,
+            total_fats=first.total_fats,
+            total_calories=first.total_calories,
+            meal_count=first.meal_count
+        )
+
+        today_stats = TodayStatsResponse(
+            total_carbs=first.today_carbs,
+            total_proteins=first.today_proteins,
+            total_fats=first.today_fats,
+            total_calories=first.today_calories,
+            meal_count=first.today_meal_count,
+            date=str(date.today())
+        )
+
+        return DashboardResponse(meals=meals, today_stats=today_stats, stats=stats)
@@ -4,6 +4,7 @@ from database import engine
 from models import Base
 from meals.meals_router import router as meals_router
 from stats.stats_router import router as stats_router
+from dashboard.dashboard_router import router as dashboard_router
 
 Base.metadata.create_all(bind=engine)
 
@@ -22,6 +23,7 @@ app.add_middleware(
 
 app.include_router(meals_router)
 app.include_router(stats_router)
+app.include_router(dashboard_router)
 
 @app.get("/health")
 def health_check():
@@ -0,0 +1,271 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from typing import Callable, Deque, Dict, Optional
+
+
+class TokenBucket:
+    """Per-user rate limit allowing bursts of `capacity` requests, refilled continuously"""
+
+    def __init__(self, capacity: float, refill_per_second: float, now: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = now
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+        self.updated_at = now
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+    def take(self, now: float) -> float:
+        """
+        Takes a token if one is available.
+
+        Returns:
+            0 if a token was taken, otherwise the seconds until one will be available
+        """
+        self._refill(now)
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.refill_per_second
+
+
+class CircuitBreaker:
+    """
+    Stops calling the upstream after `failure_threshold` consecutive failures, where calls
+    slower than `latency_threshold` seconds count as failures too. After `reset_timeout`
+    seconds a single probe call is let through (half-open) while everything else is still
+    rejected; the probe failing reopens the circuit and the probe succeeding closes it.
+    """
+
+    def __init__(self, failure_threshold: int, latency_threshold: float, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    def retry_after(self, now: float) -> float:
+        """
+        Returns how long callers should wait before retrying, or 0 if a call may go
+        through. Half-open, that is 0 only while no probe is in flight.
+        """
+        if self.opened_at is None:
+            return 0.0
+        remaining = self.opened_at + self.reset_timeout - now
+        if remaining > 0:
+            return remaining
+        if self.probing:
+            return self.latency_threshold
+        return 0.0
+
+    def start_probe(self) -> bool:
+        """Claims the half-open probe; returns whether the caller is the probe"""
+        if self.opened_at is None:
+            return False
+        self.probing = True
+        return True
+
+    def record(self, latency: float, failed: bool, now: float, probe: bool = False) -> None:
+        if probe:
+            self.probing = False
+
+        if failed or latency > self.latency_threshold:
+            self.consecutive_failures += 1
+            if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = now
+        else:
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+
+class AdmissionController:
+    """
+    Guards the AI inference routes so a slow or failing upstream cannot exhaust the
+    threadpool shared with the other routes.
+
+    Requests are rejected with 503 while the circuit breaker is open and with 429 once
+    the user's token bucket is empty. At most `max_concurrent` calls run at a time;
+    up to `max_queue` more wait on the event loop (not on a thread) for at most
+    `max_wait` seconds, and anything beyond that is rejected with 503. All rejections
+    carry a Retry-After header. Buckets that have refilled are pruned every
+    `prune_interval` acquisitions, so idle usernames do not accumulate.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queue: int = 16,
+        max_wait: float = 5.0,
+        user_burst: float = 5,
+        user_refill_per_second: float = 0.2,
+        breaker_failure_threshold: int = 5,
+        breaker_latency_threshold: float = 20.0,
+        breaker_reset_timeout: float = 30.0,
+        prune_interval: int = 1000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.user_burst = user_burst
+        self.user_refill_per_second = user_refill_per_second
+        self.breaker = CircuitBreaker(
+            breaker_failure_threshold,
+            breaker_latency_threshold,
+            breaker_reset_timeout
+        )
+        self.prune_interval = prune_interval
+        self._clock = clock
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._acquisitions = 0
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_concurrent=int(os.getenv("AI_MAX_CONCURRENT", "8")),
+            max_queue=int(os.getenv("AI_MAX_QUEUE", "16")),
+            max_wait=float(os.getenv("AI_MAX_WAIT_SECONDS", "5")),
+            user_burst=float(os.getenv("AI_USER_BURST", "5")),
+            user_refill_per_second=float(os.getenv("AI_USER_REFILL_PER_SECOND", "0.2")),
+            breaker_failure_threshold=int(os.getenv("AI_BREAKER_FAILURE_THRESHOLD", "5")),
+            breaker_latency_threshold=float(os.getenv("AI_BREAKER_LATENCY_SECONDS", "20")),
+            breaker_reset_timeout=float(os.getenv("AI_BREAKER_RESET_SECONDS", "30"))
+        )
+
+    def _reject(self, status_code: int, detail: str, retry_after: float):
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+    async def acquire(self, username: str) -> bool:
+        """
+        Waits for a slot to call the upstream, or raises HTTPException 429/503.
+
+        Returns:
+            Whether this call is the circuit breaker's half-open probe; pass it on to release
+        """
+        now = self._clock()
+
+        retry_after = self.breaker.retry_after(now)
+        if retry_after:
+            self._reject(503, "AI service is temporarily unavailable", retry_after)
+
+        probe = self.breaker.start_probe()
+        try:
+            await self._acquire_slot(username, now)
+        except BaseException:
+            if probe:
+                self.breaker.probing = False
+            raise
+        return probe
+
+    async def _acquire_slot(self, username: str, now: float) -> None:
+        slot_free = self._active < self.max_concurrent and not self._waiters
+        # Checked before taking a token so a busy rejection does not cost the user one
+        if not slot_free and len(self._waiters) >= self.max_queue:
+            self._reject(503, "AI service is busy", self.max_wait)
+
+        self._acquisitions += 1
+        if self._acquisitions % self.prune_interval == 0:
+            self._prune_buckets(now)
+
+        bucket = self._buckets.get(username)
+        if bucket is None:
+            bucket = self._buckets[username] = TokenBucket(
+                self.user_burst,
+                self.user_refill_per_second,
+                now
+            )
+        retry_after = bucket.take(now)
+        if retry_after:
+            self._reject(429, "Too many AI requests, please slow down", retry_after)
+
+        if slot_free:
+            self._active += 1
+            return
+
+        # A released slot is handed to the waiter directly, so _active is not touched here
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=self.max_wait)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+        if not waiter.done():
+            self._abandon(waiter)
+            self._reject(503, "AI service is busy", self.max_wait)
+
+    def _prune_buckets(self, now: float) -> None:
+        # A full bucket behaves exactly like a new one, so dropping it loses nothing
+        for username in [name for name, bucket in self._buckets.items() if bucket.is_full(now)]:
+            del self._buckets[username]
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        if waiter.done():
+            self._hand_off()
+        else:
+            waiter.cancel()
+            self._waiters.remove(waiter)
+
+    def _hand_off(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def release(self, latency: Optional[float], failed: bool = False, probe: bool = False) -> None:
+        """
+        Frees the slot taken by acquire and records the upstream call's outcome.
+
+        Pass latency=None for calls abandoned before completing (e.g. the client
+        disconnected); those are not held against the upstream.
+        """
+        if latency is not None:
+            self.breaker.record(latency, failed, self._clock(), probe)
+        elif probe:
+            self.breaker.probing = False
+        self._hand_off()
+
+    @asynccontextmanager
+    async def admit(self, username: str):
+        """Holds a slot for the duration of the block, recording any exception as a failure"""
+        probe = await self.acquire(username)
+        started = self._clock()
+        failed = None
+        try:
+            yield
+            failed = False
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(None if failed is None else self._clock() - started, bool(failed), probe)
+
+
+ai_admission_controller = AdmissionController.from_env()
+
+def get_ai_admission_controller() -> AdmissionController:
+    return ai_admission_controller
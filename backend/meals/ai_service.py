@@ -1,7 +1,22 @@
 import os
+from functools import lru_cache
 from openai import OpenAI
 from pydantic import BaseModel
-from typing import Optional
+from typing import Iterator, Optional, Tuple
+
+
+SYSTEM_PROMPT = """You are a nutrition expert assistant. When given a description of a meal or food,
+analyze it and provide accurate estimates of its macronutrient content.
+
+Guidelines:
+- title: Create a concise, clear name for the meal (e.g., "Grilled Chicken Salad" not just "chicken")
+- carbs: Carbohydrates in grams
+- proteins: Protein content in grams
+- fats: Fat content in grams
+- total_calories: Total caloric content
+
+Be as accurate as possible with standard portion sizes. If the description is vague,
+use typical serving sizes. All values should be positive numbers."""
 
 
 class MealMacros(BaseModel):
@@ -18,47 +33,101 @@ class AIService:
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY environment variable not set")
-        self.client = OpenAI(api_key=api_key)
-    
+        # The client also honours OPENAI_BASE_URL, which lets tests point it at a local fake server.
+        # Calls are not retried and are cut off after AI_UPSTREAM_TIMEOUT_SECONDS, so a hung upstream
+        # cannot hold its admission slot forever. Keep it above AI_BREAKER_LATENCY_SECONDS so calls
+        # that are slow but succeed still reach the circuit breaker as latency spikes.
+        self.client = OpenAI(
+            api_key=api_key,
+            timeout=float(os.getenv("AI_UPSTREAM_TIMEOUT_SECONDS", "60")),
+            max_retries=0
+        )
+
+    def _build_messages(self, description: str) -> list:
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"Analyze this meal and provide macronutrient information: {description}"}
+        ]
+
     def infer_meal_macros(self, description: str) -> MealMacros:
         """
         Uses OpenAI to infer macronutrients from a meal description.
-        
+
         Args:
             description: Natural language description of the meal
-            
+
         Returns:
             MealMacros object with structured meal data
         """
-        system_prompt = """You are a nutrition expert assistant. When given a description of a meal or food, 
-analyze it and provide accurate estimates of its macronutrient content.
-
-Guidelines:
-- title: Create a concise, clear name for the meal (e.g., "Grilled Chicken Salad" not just "chicken")
-- carbs: Carbohydrates in grams
-- proteins: Protein content in grams
-- fats: Fat content in grams
-- total_calories: Total caloric content
-
-Be as accurate as possible with standard portion sizes. If the description is vague, 
-use typical serving sizes. All values should be positive numbers."""
-
         try:
             completion = self.client.beta.chat.completions.parse(
                 model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Analyze this meal and provide macronutrient information: {description}"}
-                ],
+                messages=self._build_messages(description),
                 response_format=MealMacros,
             )
-            
+
             meal_data = completion.choices[0].message.parsed
             if not meal_data:
                 raise ValueError("Failed to parse response from OpenAI")
-            
+
             return meal_data
-            
+
+        except Exception as e:
+            raise Exception(f"Error calling OpenAI API: {str(e)}")
+
+    def stream_meal_macros(self, description: str) -> Iterator[Tuple[str, object]]:
+        """
+        Streams macronutrients inferred from a meal description as they are parsed.
+
+        Yields ("field", {"name": ..., "value": ...}) once each field's value is
+        final (title first, then each macro in schema order), followed by a single
+        ("meal", MealMacros) with the fully parsed response.
+
+        Args:
+            description: Natural language description of the meal
+        """
+        emitted = set()
+
+        try:
+            with self.client.beta.chat.completions.stream(
+                model="gpt-4o-mini",
+                messages=self._build_messages(description),
+                response_format=MealMacros,
+            ) as stream:
+                for event in stream:
+                    if event.type == "content.delta" and isinstance(event.parsed, dict):
+                        keys = list(event.parsed.keys())
+                        for index, name in enumerate(keys):
+                            value = event.parsed[name]
+                            # Partial JSON drops unfinished strings but may truncate numbers,
+                            # so a number is only final once the next key has started
+                            is_final = isinstance(value, str) or index < len(keys) - 1
+                            if name not in emitted and is_final:
+                                emitted.add(name)
+                                yield "field", {"name": name, "value": value}
+                    elif event.type == "content.done":
+                        meal_data = event.parsed
+                        if not meal_data:
+                            raise ValueError("Failed to parse response from OpenAI")
+
+                        for name, value in meal_data.model_dump().items():
+                            if name not in emitted:
+                                emitted.add(name)
+                                yield "field", {"name": name, "value": value}
+
+                        yield "meal", meal_data
+                        return
+
+            raise ValueError("OpenAI stream ended without a complete response")
+
         except Exception as e:
             raise Exception(f"Error calling OpenAI API: {str(e)}")
 
+
+@lru_cache(maxsize=None)
+def get_ai_service() -> AIService:
+    """
+    Shared AIService, so its OpenAI client (and connection pool) is built once rather
+    than on the event loop for every request. Raises ValueError until the API key is set.
+    """
+    return AIService()
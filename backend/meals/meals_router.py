@@ -1,10 +1,16 @@
+import json
+import time
+import anyio
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Callable, List, Optional
 from database import get_db
 from schemas import MealCreate, MealResponse, AIMealRequest, AIMealResponse
 from .meals_service import MealsService
-from .ai_service import AIService
+from .ai_service import get_ai_service
+from .admission_control import AdmissionController, get_ai_admission_controller
 
 router = APIRouter(prefix="/meals", tags=["meals"])
 
@@ -28,28 +34,123 @@ def delete_meal(meal_id: int, db: Session = Depends(get_db)):
     return service.delete_meal(meal_id)
 
 @router.post("/ai-infer", response_model=AIMealResponse)
-def infer_meal_from_description(request: AIMealRequest):
+async def infer_meal_from_description(
+    request: AIMealRequest,
+    admission: AdmissionController = Depends(get_ai_admission_controller)
+):
     """
     Uses AI to infer macronutrients from a natural language meal description.
-    
+
+    Requests go through admission control and may be rejected with 429/503 and a
+    Retry-After header. Admitted calls run in the threadpool; queued ones wait on
+    the event loop so they cannot starve the other routes.
+
     Args:
         request: Contains the meal description and username
-        
+
     Returns:
         AIMealResponse with inferred meal data (title, carbs, proteins, fats, calories)
     """
     try:
-        ai_service = AIService()
-        meal_data = ai_service.infer_meal_macros(request.description)
-        
-        return AIMealResponse(
-            title=meal_data.title,
-            carbs=meal_data.carbs,
-            proteins=meal_data.proteins,
-            fats=meal_data.fats,
-            total_calories=meal_data.total_calories
-        )
+        ai_service = get_ai_service()
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to infer meal data: {str(e)}")
\ No newline at end of file
+
+    async with admission.admit(request.username):
+        try:
+            meal_data = await run_in_threadpool(ai_service.infer_meal_macros, request.description)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Failed to infer meal data: {str(e)}")
+
+    return AIMealResponse(
+        title=meal_data.title,
+        carbs=meal_data.carbs,
+        proteins=meal_data.proteins,
+        fats=meal_data.fats,
+        total_calories=meal_data.total_calories
+    )
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+class _AdmittedStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that calls `release` exactly once however the response ends,
+    including when the client disconnects before the body iterator ever starts.
+    """
+
+    def __init__(self, content, release: Callable[[], None], **kwargs):
+        super().__init__(content, **kwargs)
+        self._release = release
+        self._released = False
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            with anyio.CancelScope(shield=True):
+                # Runs the body's cleanup now if a disconnect left it suspended at a yield
+                await self.body_iterator.aclose()
+            if not self._released:
+                self._released = True
+                self._release()
+
+@router.post("/ai-infer/stream")
+async def stream_meal_from_description(
+    request: AIMealRequest,
+    admission: AdmissionController = Depends(get_ai_admission_controller)
+):
+    """
+    Streams AI-inferred macronutrients as server-sent events while the model responds.
+
+    Emits a `field` event per parsed field (title first, then each macro), a final
+    `meal` event with the validated AIMealResponse, or an `error` event on failure.
+    Admission control applies as for /meals/ai-infer, before the stream starts.
+
+    Args:
+        request: Contains the meal description and username
+    """
+    try:
+        ai_service = get_ai_service()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    probe = await admission.acquire(request.username)
+    started = time.monotonic()
+    outcome = {}
+
+    async def event_stream():
+        # Created here so nothing is opened upstream if the body is never iterated
+        stream = ai_service.stream_meal_macros(request.description)
+        try:
+            while True:
+                # Threadpool calls are not cancellable, so a disconnect only lands once next() returns
+                item = await run_in_threadpool(next, stream, None)
+                if item is None:
+                    break
+                event, payload = item
+                if event == "meal":
+                    meal = AIMealResponse(**payload.model_dump())
+                    yield _sse_event("meal", meal.model_dump())
+                else:
+                    yield _sse_event(event, payload)
+            outcome["failed"] = False
+        except Exception as e:
+            outcome["failed"] = True
+            yield _sse_event("error", {"detail": f"Failed to infer meal data: {str(e)}"})
+        finally:
+            outcome["latency"] = time.monotonic() - started
+            # Close the upstream stream before the slot is freed, even when cancelled
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(stream.close)
+
+    def release():
+        failed = outcome.get("failed")
+        admission.release(None if failed is None else outcome["latency"], bool(failed), probe)
+
+    return _AdmittedStreamingResponse(
+        event_stream(),
+        release,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class MealCreate(BaseModel):
     username: str
@@ -46,6 +46,11 @@ class StatsResponse(BaseModel):
 class TodayStatsResponse(StatsResponse):
     date: str
 
+class DashboardResponse(BaseModel):
+    meals: List[MealResponse]
+    today_stats: TodayStatsResponse
+    stats: StatsResponse
+
 class AIMealRequest(BaseModel):
     description: str
     username: str
@@ -0,0 +1,323 @@
+"""
+Unit tests for admission control in front of the AI inference routes.
+Uses a fake clock so no test depends on wall-clock timing.
+"""
+
+import asyncio
+import pytest
+import sys
+import os
+from fastapi import HTTPException
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from meals.admission_control import AdmissionController, CircuitBreaker, TokenBucket
+from meals.ai_service import AIService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _controller(clock, **overrides):
+    options = dict(
+        max_concurrent=2,
+        max_queue=1,
+        max_wait=0.05,
+        user_burst=100,
+        user_refill_per_second=1,
+        breaker_failure_threshold=3,
+        breaker_latency_threshold=10.0,
+        breaker_reset_timeout=30.0,
+        clock=clock
+    )
+    options.update(overrides)
+    return AdmissionController(**options)
+
+
+class TestTokenBucket:
+    """Test per-user token bucket refill and rejection"""
+
+    def test_burst_then_reject(self):
+        """Test that a full bucket allows a burst and then reports the wait"""
+        bucket = TokenBucket(capacity=2, refill_per_second=0.5, now=0.0)
+
+        assert bucket.take(0.0) == 0.0
+        assert bucket.take(0.0) == 0.0
+        assert bucket.take(0.0) == pytest.approx(2.0)
+
+    def test_refills_over_time(self):
+        """Test that tokens come back at the refill rate, capped at capacity"""
+        bucket = TokenBucket(capacity=1, refill_per_second=1, now=0.0)
+        bucket.take(0.0)
+
+        assert bucket.take(0.5) == pytest.approx(0.5)
+        assert bucket.take(1.0) == 0.0
+
+        bucket.take(100.0)
+        assert bucket.take(100.0) > 0
+
+
+class TestCircuitBreaker:
+    """Test circuit breaker state transitions"""
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the breaker opens once the failure threshold is reached"""
+        breaker = CircuitBreaker(failure_threshold=2, latency_threshold=5.0, reset_timeout=30.0)
+
+        breaker.record(1.0, failed=True, now=0.0)
+        assert breaker.retry_after(0.0) == 0.0
+
+        breaker.record(1.0, failed=True, now=0.0)
+        assert breaker.retry_after(10.0) == pytest.approx(20.0)
+
+    def test_slow_calls_count_as_failures(self):
+        """Test that latency spikes trip the breaker like errors"""
+        breaker = CircuitBreaker(failure_threshold=2, latency_threshold=5.0, reset_timeout=30.0)
+
+        breaker.record(6.0, failed=False, now=0.0)
+        breaker.record(6.0, failed=False, now=0.0)
+
+        assert breaker.retry_after(0.0) > 0
+
+    def test_success_resets_failure_count(self):
+        """Test that failures must be consecutive"""
+        breaker = CircuitBreaker(failure_threshold=2, latency_threshold=5.0, reset_timeout=30.0)
+
+        breaker.record(1.0, failed=True, now=0.0)
+        breaker.record(1.0, failed=False, now=0.0)
+        breaker.record(1.0, failed=True, now=0.0)
+
+        assert breaker.retry_after(0.0) == 0.0
+
+    def test_half_open_failure_reopens_and_success_closes(self):
+        """Test that after the reset timeout the probe's result decides the breaker state"""
+        breaker = CircuitBreaker(failure_threshold=2, latency_threshold=5.0, reset_timeout=30.0)
+        breaker.record(1.0, failed=True, now=0.0)
+        breaker.record(1.0, failed=True, now=0.0)
+
+        assert breaker.retry_after(30.0) == 0.0
+        assert breaker.start_probe()
+        breaker.record(1.0, failed=True, now=30.0, probe=True)
+        assert breaker.retry_after(30.0) == pytest.approx(30.0)
+
+        assert breaker.start_probe()
+        breaker.record(1.0, failed=False, now=60.0, probe=True)
+        assert breaker.opened_at is None
+        assert breaker.consecutive_failures == 0
+        assert not breaker.start_probe()
+
+    def test_half_open_admits_single_probe(self):
+        """Test that other calls are rejected while the probe is in flight"""
+        breaker = CircuitBreaker(failure_threshold=1, latency_threshold=5.0, reset_timeout=30.0)
+        breaker.record(1.0, failed=True, now=0.0)
+
+        assert breaker.retry_after(30.0) == 0.0
+        breaker.start_probe()
+        assert breaker.retry_after(30.0) == pytest.approx(5.0)
+
+
+class TestAdmissionController:
+    """Test admission, queueing and fast rejection"""
+
+    def test_rate_limited_user_gets_429_with_retry_after(self):
+        """Test that an exhausted token bucket rejects only that user"""
+        async def scenario():
+            controller = _controller(FakeClock(), user_burst=1, user_refill_per_second=0.25)
+            async with controller.admit("alice"):
+                pass
+
+            with pytest.raises(HTTPException) as exc_info:
+                await controller.acquire("alice")
+
+            async with controller.admit("bob"):
+                pass
+            return exc_info.value
+
+        error = asyncio.run(scenario())
+        assert error.status_code == 429
+        assert error.headers["Retry-After"] == "4"
+
+    def test_full_queue_rejected_immediately(self):
+        """Test that requests beyond concurrency plus queue get 503 without waiting"""
+        async def scenario():
+            controller = _controller(FakeClock(), max_wait=10)
+            await controller.acquire("a")
+            await controller.acquire("b")
+            queued = asyncio.create_task(controller.acquire("c"))
+            await asyncio.sleep(0)
+
+            with pytest.raises(HTTPException) as exc_info:
+                await controller.acquire("d")
+
+            controller.release(0.1)
+            await queued
+            return controller, exc_info.value
+
+        controller, error = asyncio.run(scenario())
+        assert error.status_code == 503
+        assert "Retry-After" in error.headers
+        assert controller._active == 2
+        assert not controller._waiters
+
+    def test_queued_request_times_out(self):
+        """Test that a queued request gives up after max_wait with 503"""
+        async def scenario():
+            controller = _controller(FakeClock())
+            await controller.acquire("a")
+            await controller.acquire("b")
+
+            with pytest.raises(HTTPException) as exc_info:
+                await controller.acquire("c")
+            return controller, exc_info.value
+
+        controller, error = asyncio.run(scenario())
+        assert error.status_code == 503
+        assert controller._active == 2
+        assert not controller._waiters
+
+    def test_cancelled_waiter_does_not_leak_slot(self):
+        """Test that a request cancelled while queued leaves the queue"""
+        async def scenario():
+            controller = _controller(FakeClock(), max_wait=10)
+            await controller.acquire("a")
+            await controller.acquire("b")
+            queued = asyncio.create_task(controller.acquire("c"))
+            await asyncio.sleep(0)
+
+            queued.cancel()
+            await asyncio.gather(queued, return_exceptions=True)
+            controller.release(0.1)
+            controller.release(0.1)
+            return controller
+
+        controller = asyncio.run(scenario())
+        assert controller._active == 0
+        assert not controller._waiters
+
+    def test_open_breaker_rejects_with_503(self):
+        """Test that upstream failures inside admit trip the breaker"""
+        clock = FakeClock()
+
+        async def scenario():
+            controller = _controller(clock)
+            for _ in range(3):
+                with pytest.raises(RuntimeError):
+                    async with controller.admit("alice"):
+                        raise RuntimeError("upstream down")
+
+            clock.now += 5
+            with pytest.raises(HTTPException) as exc_info:
+                await controller.acquire("alice")
+            return controller, exc_info.value
+
+        controller, error = asyncio.run(scenario())
+        assert error.status_code == 503
+        assert error.headers["Retry-After"] == "25"
+        assert controller._active == 0
+
+    def test_half_open_lets_one_request_through(self):
+        """Test that only the probe is admitted once the reset timeout has passed"""
+        clock = FakeClock()
+
+        async def scenario():
+            controller = _controller(clock, breaker_failure_threshold=1)
+            with pytest.raises(RuntimeError):
+                async with controller.admit("alice"):
+                    raise RuntimeError("upstream down")
+
+            clock.now += 30
+            probe = await controller.acquire("alice")
+            with pytest.raises(HTTPException) as exc_info:
+                await controller.acquire("bob")
+
+            controller.release(0.1, probe=probe)
+            await controller.acquire("bob")
+            return probe, exc_info.value
+
+        probe, error = asyncio.run(scenario())
+        assert probe
+        assert error.status_code == 503
+
+    def test_rejected_probe_frees_half_open_slot(self):
+        """Test that a probe rejected by its rate limit does not block the next probe"""
+        clock = FakeClock()
+
+        async def scenario():
+            controller = _controller(clock, breaker_failure_threshold=1, user_burst=1, user_refill_per_second=0.001)
+            with pytest.raises(RuntimeError):
+                async with controller.admit("alice"):
+                    raise RuntimeError("upstream down")
+
+            clock.now += 30
+            with pytest.raises(HTTPException) as exc_info:
+                await controller.acquire("alice")
+            return exc_info.value, await controller.acquire("bob")
+
+        error, probe = asyncio.run(scenario())
+        assert error.status_code == 429
+        assert probe
+
+    def test_busy_rejection_keeps_user_token(self):
+        """Test that a 503 for a full queue does not spend the user's rate limit"""
+        async def scenario():
+            controller = _controller(FakeClock(), max_queue=0, user_burst=1, user_refill_per_second=0.001)
+            await controller.acquire("a")
+            await controller.acquire("b")
+
+            with pytest.raises(HTTPException) as exc_info:
+                await controller.acquire("alice")
+
+            controller.release(0.1)
+            await controller.acquire("alice")
+            return exc_info.value
+
+        error = asyncio.run(scenario())
+        assert error.status_code == 503
+
+    def test_refilled_buckets_are_pruned(self):
+        """Test that buckets of idle users are dropped once they have refilled"""
+        clock = FakeClock()
+
+        async def scenario():
+            controller = _controller(clock, max_concurrent=100, user_burst=2, prune_interval=3)
+            for username in ("a", "b"):
+                async with controller.admit(username):
+                    pass
+
+            clock.now += 10
+            async with controller.admit("c"):
+                pass
+            return controller
+
+        controller = asyncio.run(scenario())
+        assert list(controller._buckets) == ["c"]
+
+
+class TestUpstreamClient:
+    """Test that upstream calls cannot hold admission slots indefinitely"""
+
+    def test_client_times_out_without_retries(self, monkeypatch):
+        """Test that the OpenAI client timeout follows AI_UPSTREAM_TIMEOUT_SECONDS"""
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        monkeypatch.setenv("AI_UPSTREAM_TIMEOUT_SECONDS", "3")
+
+        client = AIService().client
+
+        assert client.timeout == 3.0
+        assert client.max_retries == 0
+
+    def test_default_timeout_outlasts_breaker_latency_threshold(self, monkeypatch):
+        """Test that slow but successful calls finish and can be recorded as latency spikes"""
+        monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+        monkeypatch.delenv("AI_UPSTREAM_TIMEOUT_SECONDS", raising=False)
+        monkeypatch.delenv("AI_BREAKER_LATENCY_SECONDS", raising=False)
+
+        client = AIService().client
+
+        assert client.timeout > AdmissionController.from_env().breaker.latency_threshold
@@ -0,0 +1,278 @@
+"""
+Tests for streaming AI meal inference against a local fake OpenAI server.
+No real API calls are made.
+"""
+
+import asyncio
+import json
+import threading
+import pytest
+import sys
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.testclient import TestClient
+from main import app
+from schemas import AIMealResponse
+from meals.admission_control import AdmissionController, get_ai_admission_controller
+from meals.ai_service import AIService, MealMacros, get_ai_service
+from meals.meals_router import _sse_event
+
+
+MEAL_JSON = '{"title":"Grilled Chicken Salad","carbs":12.5,"proteins":35.0,"fats":9.0,"total_calories":270.0}'
+CHUNK_SIZE = 8
+# Chunks needed before the title string (and its closing quote) has been sent
+TITLE_CHUNKS = MEAL_JSON.index('",') // CHUNK_SIZE + 1
+
+
+def _chunk(content=None, finish_reason=None):
+    delta = {"content": content} if content is not None else {}
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """
+    Replays MEAL_JSON as a chat completion stream, a few characters per chunk.
+
+    Counts sent chunks on `server.chunks_sent`, pauses after the title until
+    `server.gate` is set (when one is given), and answers 500 when `server.fail` is set.
+    """
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+
+        if self.server.fail:
+            payload = json.dumps({"error": {"message": "upstream failure", "type": "server_error"}}).encode()
+            self.send_response(500)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+
+        pieces = [MEAL_JSON[i:i + CHUNK_SIZE] for i in range(0, len(MEAL_JSON), CHUNK_SIZE)]
+        chunks = [_chunk(piece) for piece in pieces] + [_chunk(finish_reason="stop")]
+        for index, chunk in enumerate(chunks):
+            if index == TITLE_CHUNKS and self.server.gate is not None:
+                self.server.gate.wait(timeout=10)
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            self.server.chunks_sent += 1
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.fail = False
+    server.gate = None
+    server.chunks_sent = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    # The router shares one AIService; rebuild it so it picks up this server's URL
+    get_ai_service.cache_clear()
+    yield server
+
+    get_ai_service.cache_clear()
+    if server.gate is not None:
+        server.gate.set()
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def admission():
+    controller = AdmissionController(max_concurrent=2)
+    app.dependency_overrides[get_ai_admission_controller] = lambda: controller
+    yield controller
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(admission):
+    return TestClient(app)
+
+
+def _call_stream_route(admission, receive_after_body):
+    """
+    Drives POST /meals/ai-infer/stream through the raw ASGI interface.
+    `receive_after_body` is awaited for every receive() after the request body.
+
+    Returns the sent messages and the admission slots still held once the app returned,
+    checked before the event loop closes and finalizes any leftover generators.
+    """
+    body = json.dumps({"description": "chicken salad", "username": "alice"}).encode()
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/meals/ai-infer/stream",
+        "raw_path": b"/meals/ai-infer/stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+    messages = []
+    body_sent = False
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive_after_body(messages)
+
+    async def send(message):
+        messages.append(message)
+        # Like a real server, let other tasks (the disconnect listener) run while sending
+        await asyncio.sleep(0)
+
+    async def call():
+        await app(scope, receive, send)
+        return admission._active
+
+    active = asyncio.run(call())
+    return messages, active
+
+
+def _parse_sse(body: str):
+    events = []
+    for message in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestStreamMealMacros:
+    """Test AIService.stream_meal_macros partial field emission"""
+
+    def test_fields_emitted_in_order_then_meal(self, fake_openai):
+        """Test that title comes first, each macro once, and the final meal is parsed"""
+        events = list(AIService().stream_meal_macros("chicken salad"))
+
+        field_names = [payload["name"] for event, payload in events if event == "field"]
+        assert field_names == ["title", "carbs", "proteins", "fats", "total_calories"]
+
+        event, meal = events[-1]
+        assert event == "meal"
+        assert isinstance(meal, MealMacros)
+        assert meal.title == "Grilled Chicken Salad"
+        assert meal.total_calories == 270.0
+
+    def test_numbers_not_emitted_truncated(self, fake_openai):
+        """Test that streamed macro values match the final parsed values"""
+        events = list(AIService().stream_meal_macros("chicken salad"))
+
+        fields = {payload["name"]: payload["value"] for event, payload in events if event == "field"}
+        assert fields == json.loads(MEAL_JSON)
+
+    def test_title_arrives_before_stream_completes(self, fake_openai):
+        """Test that title is yielded while the upstream is still holding back the macros"""
+        fake_openai.gate = threading.Event()
+        stream = AIService().stream_meal_macros("chicken salad")
+
+        event, payload = next(stream)
+        chunks_at_title = fake_openai.chunks_sent
+        fake_openai.gate.set()
+        list(stream)
+
+        assert event == "field" and payload["name"] == "title"
+        assert chunks_at_title == TITLE_CHUNKS
+        assert fake_openai.chunks_sent > TITLE_CHUNKS
+
+
+class TestStreamEndpoint:
+    """Test POST /meals/ai-infer/stream end to end against the fake server"""
+
+    def test_streams_fields_then_meal(self, fake_openai, client, admission):
+        """Test SSE content type, field order and the validated final meal"""
+        response = client.post("/meals/ai-infer/stream", json={"description": "chicken salad", "username": "alice"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = _parse_sse(response.text)
+        assert [payload["name"] for event, payload in events if event == "field"] == [
+            "title", "carbs", "proteins", "fats", "total_calories"
+        ]
+        event, payload = events[-1]
+        assert event == "meal"
+        assert AIMealResponse(**payload) == AIMealResponse(**json.loads(MEAL_JSON))
+        assert "alice" in admission._buckets
+        assert admission._active == 0
+        assert admission.breaker.consecutive_failures == 0
+
+    def test_upstream_error_becomes_error_event(self, fake_openai, client, admission):
+        """Test that an upstream 500 ends the stream with an error event"""
+        fake_openai.fail = True
+
+        response = client.post("/meals/ai-infer/stream", json={"description": "chicken salad", "username": "alice"})
+
+        assert response.status_code == 200
+        events = _parse_sse(response.text)
+        assert [event for event, payload in events] == ["error"]
+        assert "Failed to infer meal data" in events[0][1]["detail"]
+        assert admission._active == 0
+        assert admission.breaker.consecutive_failures == 1
+
+    def test_immediate_disconnect_releases_slot(self, fake_openai, admission):
+        """Test that a client gone before the body starts does not keep its slot"""
+        async def disconnect(messages):
+            return {"type": "http.disconnect"}
+
+        for _ in range(admission.max_concurrent + 1):
+            messages, active = _call_stream_route(admission, disconnect)
+            assert active == 0
+        assert admission.breaker.consecutive_failures == 0
+
+    def test_disconnect_mid_stream_releases_slot(self, fake_openai, admission):
+        """Test that a client leaving mid-stream frees the slot without counting as a failure"""
+        fake_openai.gate = threading.Event()
+
+        async def disconnect_after_title(messages):
+            while not any(b"Grilled Chicken Salad" in message.get("body", b"") for message in messages):
+                await asyncio.sleep(0.01)
+            fake_openai.gate.set()
+            return {"type": "http.disconnect"}
+
+        messages, active = _call_stream_route(admission, disconnect_after_title)
+
+        assert b"event: meal" not in b"".join(message.get("body", b"") for message in messages)
+        assert active == 0
+        assert admission.breaker.consecutive_failures == 0
+
+
+class TestSSEFormatting:
+    """Test server-sent event framing"""
+
+    def test_sse_event_format(self):
+        """Test that events are framed with event and data lines"""
+        message = _sse_event("field", {"name": "title", "value": "Toast"})
+
+        assert message == 'event: field\ndata: {"name": "title", "value": "Toast"}\n\n'
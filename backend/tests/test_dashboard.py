@@ -0,0 +1,116 @@
+"""
+Tests for the combined dashboard query against an in-memory SQLite database.
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add parent directory to path to import backend modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models import Base, Meal
+from dashboard.dashboard_service import DashboardService
+from meals.meals_service import MealsService
+from stats.stats_service import StatsService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _add_meal(db, username, title, calories, created_at=None, deleted=False):
+    meal = Meal(
+        username=username,
+        title=title,
+        carbs=calories / 10,
+        proteins=calories / 20,
+        fats=calories / 40,
+        total_calories=calories,
+        created_at=created_at or datetime.now(),
+        deleted_at=datetime.now() if deleted else None
+    )
+    db.add(meal)
+    db.commit()
+    return meal
+
+
+class TestDashboardService:
+    """Test DashboardService.get_dashboard"""
+
+    def test_matches_separate_endpoints(self, db):
+        """Test that the dashboard equals the three separate calls combined"""
+        now = datetime.now()
+        _add_meal(db, "alice", "Breakfast", 300.0, created_at=now - timedelta(minutes=10))
+        _add_meal(db, "alice", "Lunch", 600.0, created_at=now)
+        _add_meal(db, "alice", "Old Dinner", 800.0, created_at=now - timedelta(days=2))
+        _add_meal(db, "alice", "Deleted Snack", 150.0, deleted=True)
+        _add_meal(db, "bob", "Other User", 999.0)
+
+        dashboard = DashboardService(db).get_dashboard("alice")
+        meals = MealsService(db).get_meals_by_username("alice", "today")
+
+        assert [meal.id for meal in dashboard.meals] == [meal.id for meal in meals]
+        assert [meal.title for meal in dashboard.meals] == ["Lunch", "Breakfast"]
+        assert dashboard.today_stats == StatsService(db).get_today_stats("alice")
+        assert dashboard.stats == StatsService(db).get_user_stats("alice")
+        assert dashboard.today_stats.total_calories == 900.0
+        assert dashboard.stats.total_calories == 1700.0
+        assert dashboard.stats.meal_count == 3
+
+    def test_lifetime_stats_without_meals_today(self, db):
+        """Test that lifetime totals are returned when nothing was logged today"""
+        _add_meal(db, "alice", "Old Dinner", 800.0, created_at=datetime.now() - timedelta(days=2))
+
+        dashboard = DashboardService(db).get_dashboard("alice")
+
+        assert dashboard.meals == []
+        assert dashboard.today_stats.meal_count == 0
+        assert dashboard.today_stats.total_calories == 0
+        assert dashboard.stats.meal_count == 1
+        assert dashboard.stats.total_calories == 800.0
+
+    def test_unknown_user_returns_empty_dashboard(self, db):
+        """Test that a user with no meals gets zeroed stats"""
+        dashboard = DashboardService(db).get_dashboard("nobody")
+
+        assert dashboard.meals == []
+        assert dashboard.stats.meal_count == 0
+        assert dashboard.stats.total_carbs == 0
+        assert dashboard.today_stats.meal_count == 0
+
+    def test_single_database_round_trip(self, db):
+        """Test that the dashboard issues exactly one SQL statement"""
+        _add_meal(db, "alice", "Lunch", 600.0)
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.get_bind(), "before_cursor_execute", listener)
+
+        try:
+            DashboardService(db).get_dashboard("alice")
+        finally:
+            event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+        assert len(statements) == 1
+
+    def test_empty_username_rejected(self, db):
+        """Test that a whitespace-only username is rejected"""
+        from fastapi import HTTPException
+
+        with pytest.raises(HTTPException) as exc_info:
+            DashboardService(db).get_dashboard("   ")
+
+        assert exc_info.value.status_code == 400
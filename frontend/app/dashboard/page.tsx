@@ -28,12 +28,18 @@ export default function Dashboard() {
   const loadData = async (user: string) => {
     try {
       setLoading(true);
-      const [mealsData, statsData] = await Promise.all([
-        mealApi.getMeals(user, dateFilter),
-        mealApi.getTodayStats(user)
-      ]);
-      setMeals(mealsData);
-      setTodayStats(statsData);
+      if (dateFilter === 'today') {
+        const dashboard = await mealApi.getDashboard(user);
+        setMeals(dashboard.meals);
+        setTodayStats(dashboard.today_stats);
+      } else {
+        const [mealsData, statsData] = await Promise.all([
+          mealApi.getMeals(user, dateFilter),
+          mealApi.getTodayStats(user)
+        ]);
+        setMeals(mealsData);
+        setTodayStats(statsData);
+      }
     } catch (error) {
       console.error('Error loading data:', error);
     } finally {
@@ -42,6 +42,12 @@ export interface TodayStats extends Stats {
   date: string;
 }
 
+export interface Dashboard {
+  meals: Meal[];
+  today_stats: TodayStats;
+  stats: Stats;
+}
+
 export interface AIMealRequest {
   description: string;
   username: string;
@@ -81,6 +87,11 @@ export const mealApi = {
     return response.data;
   },
 
+  getDashboard: async (username: string): Promise<Dashboard> => {
+    const response = await api.get(`/dashboard/${username}`);
+    return response.data;
+  },
+
   inferMealFromDescription: async (request: AIMealRequest): Promise<AIMealResponse> => {
     const response = await api.post('/meals/ai-infer', request);
     return response.data;